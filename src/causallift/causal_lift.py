@@ -111,6 +111,11 @@ class CausalLift:
                 * :func:`predict`
                 * :func:`predict_proba`
 
+        use_gpu:
+            Fit the 2 XGBoost classifier models on GPU.
+            If CUDA is not available, fall back to CPU with a warning.
+            The propensity model (logistic regression) is not affected.
+            False in default.
         enable_ipw:
             Enable Inverse Probability Weighting based on the estimated propensity score.
             True in default.
@@ -331,6 +336,7 @@ class CausalLift:
                 missing=[None],
             ),
         ),  # type: Union[Dict[str, List[Any]], Type[sklearn.base.BaseEstimator]]
+        use_gpu=False,  # type: bool
         enable_ipw=True,  # type: bool
         enable_weighting=False,  # type: bool
         propensity_model_params=dict(
@@ -511,6 +517,7 @@ class CausalLift:
             max_propensity=max_propensity,
             verbose=verbose,
             uplift_model_params=uplift_model_params,
+            use_gpu=use_gpu,
             enable_ipw=enable_ipw,
             enable_weighting=enable_weighting,
             propensity_model_params=propensity_model_params,
@@ -602,8 +609,16 @@ class CausalLift:
     def _separate_train_test(self):
         # type: (...) -> Tuple[pd.DataFrame, pd.DataFrame]
 
-        self.train_df = self.df.xs("train")
-        self.test_df = self.df.xs("test")
+        # self.df is ordered train then test, so slice by position instead of
+        # looking up the partition level with xs. get_loc returns a slice if the
+        # index is lexsorted, or a boolean mask e.g. if self.df was loaded from
+        # the catalog.
+        train = self.df.index.get_loc("train")
+        n_train = train.stop if isinstance(train, slice) else train.sum()
+        self.train_df = self.df.iloc[:n_train]
+        self.train_df.index = self.train_df.index.droplevel(0)
+        self.test_df = self.df.iloc[n_train:]
+        self.test_df.index = self.test_df.index.droplevel(0)
         return self.train_df, self.test_df
 
     def estimate_cate_by_2_models(self):
@@ -620,10 +635,7 @@ class CausalLift:
                 treated__model_dict, untreated__model_dict
             )
 
-            self.treated__proba = model_for_treated_predict_proba(
-                self.args, self.df, self.uplift_models_dict
-            )
-            self.untreated__proba = model_for_untreated_predict_proba(
+            self.treated__proba, self.untreated__proba = model_for_both_predict_proba(
                 self.args, self.df, self.uplift_models_dict
             )
             self.cate_estimated = compute_cate(
@@ -681,7 +693,7 @@ class CausalLift:
 
         if cate_estimated is not None:
             self.cate_estimated = cate_estimated
-            self.df.loc[:, self.args.col_cate] = cate_estimated.values
+            self.df[self.args.col_cate] = cate_estimated.to_numpy()
         self.treatment_fractions.train = (
             treatment_fraction_train or self.treatment_fractions.train
         )
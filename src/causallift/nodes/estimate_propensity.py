@@ -1,6 +1,5 @@
 import logging
 
-from IPython.display import display
 import pandas as pd
 from sklearn import linear_model
 from sklearn.model_selection import GridSearchCV
@@ -9,16 +8,12 @@ from .utils import *  # NOQA
 
 log = logging.getLogger(__name__)
 
-try:
-    import matplotlib.pyplot as plt
-except:  # NOQA
-    print("[Warning] Could not import matplotlib.pyplot. ")
-
 
 def fit_propensity(args, df):
 
-    X_train = df.xs("train")[args.cols_features]
-    y_train = df.xs("train")[args.col_treatment]
+    train_df = df.xs("train")
+    X_train = train_df[args.cols_features]
+    y_train = train_df[args.col_treatment]
     # X_test = df.xs("test")[args.cols_features]
     # y_test = df.xs("test")[args.col_treatment]
 
@@ -75,19 +70,25 @@ def fit_propensity(args, df):
 
 def estimate_propensity(args, df, model):
 
-    X_train = df.xs("train")[args.cols_features]
-    y_train = df.xs("train")[args.col_treatment]
-    X_test = df.xs("test")[args.cols_features]
-    y_test = df.xs("test")[args.col_treatment]
+    train_df = df.xs("train")
+    test_df = df.xs("test")
+
+    X_train = train_df[args.cols_features]
+    y_train = train_df[args.col_treatment]
+    X_test = test_df[args.cols_features]
+    y_test = test_df[args.col_treatment]
 
     proba_train = model.predict_proba(X_train)[:, 1]
     proba_test = model.predict_proba(X_test)[:, 1]
 
     if args.verbose >= 3:
         log.info("\n### Histogram of propensity score for train and test data:")
-        pd.Series(proba_train).hist()
-        pd.Series(proba_test).hist()
         try:
+            # Imported here as matplotlib takes long to import.
+            import matplotlib.pyplot as plt
+
+            pd.Series(proba_train).hist()
+            pd.Series(proba_test).hist()
             plt.show()
         except:  # NOQA
             log.info("[Warning] Could not show the histogram.")
@@ -108,9 +109,6 @@ def estimate_propensity(args, df, model):
         log.info("\n### Confusion Matrix for Test:")
         display(conf_mat_df(y_test, y_pred_test))
 
-    train_df = df.xs("train")
-    test_df = df.xs("test")
-
     train_df.loc[:, args.col_propensity] = proba_train
     test_df.loc[:, args.col_propensity] = proba_test
 
@@ -1,6 +1,5 @@
 import logging
 
-from IPython.display import display
 import numpy as np
 import pandas as pd
 
@@ -23,15 +22,16 @@ class ModelForTreatedOrUntreated:
         if args.verbose >= 2:
             log.info("\n\n## Model for Treatment = {}".format(treatment_val))
 
-        df = df_.query("{}=={}".format(args.col_treatment, treatment_val)).copy()
+        df = df_.query("{}=={}".format(args.col_treatment, treatment_val))
+        train_df = df.xs("train")
 
-        X_train = df.xs("train")[args.cols_features]
-        y_train = df.xs("train")[args.col_outcome]
+        X_train = train_df[args.cols_features]
+        y_train = train_df[args.col_outcome]
 
         model = initialize_model(args, model_key="uplift_model_params")
 
-        if args.enable_ipw and (args.col_propensity in df.xs("train").columns):
-            propensity = df.xs("train")[args.col_propensity]
+        if args.enable_ipw and (args.col_propensity in train_df.columns):
+            propensity = train_df[args.col_propensity]
 
             # avoid propensity near 0 or 1 which will result in too large weight
             if propensity.min() < args.min_propensity and args.verbose >= 2:
@@ -46,8 +46,8 @@ class ModelForTreatedOrUntreated:
                         args.max_propensity
                     )
                 )
-            propensity.clip(
-                lower=args.min_propensity, upper=args.max_propensity, inplace=True
+            propensity = propensity.clip(
+                lower=args.min_propensity, upper=args.max_propensity
             )
 
             sample_weight = (
@@ -56,8 +56,8 @@ class ModelForTreatedOrUntreated:
 
             model.fit(X_train, y_train, sample_weight=sample_weight)
 
-        elif args.enable_weighting and (args.col_weight in df.xs("train").columns):
-            sample_weight = df.xs("train")[args.col_weight]
+        elif args.enable_weighting and (args.col_weight in train_df.columns):
+            sample_weight = train_df[args.col_weight]
             model.fit(X_train, y_train, sample_weight=sample_weight)
 
         else:
@@ -133,22 +133,16 @@ class ModelForTreatedOrUntreated:
         model_dict = dict(model=model, eval_df=score_original_treatment_df)
         return model_dict
 
-    def predict_proba(self, args, df_, models_dict):
+    def predict_proba(self, args, df_, models_dict, X=None):
         model = models_dict[self.treatment_label]["model"]
 
-        cols_features = args.cols_features
+        # Predict train and test at once. Pass X to reuse a feature matrix
+        # already selected from df_.
+        if X is None:
+            X = df_[args.cols_features]
 
-        X_train = df_.xs("train")[cols_features]
-        X_test = df_.xs("test")[cols_features]
-
-        y_pred_train = model.predict_proba(X_train)[:, 1]
-        y_pred_test = model.predict_proba(X_test)[:, 1]
-
-        return concat_train_test(args, y_pred_train, y_pred_test)
-
-        # X = df_[cols_features]
-        # y_pred = model.predict_proba(X)[:, 1]
-        # return y_pred
+        y_pred = model.predict_proba(X)[:, 1]
+        return pd.Series(y_pred, index=df_.index)
 
     def simulate_recommendation(self, args, df_, models_dict):
 
@@ -158,13 +152,12 @@ class ModelForTreatedOrUntreated:
         treatment_val = self.treatment_val
         verbose = args.verbose
 
-        df = df_.query("{}=={}".format(args.col_recommendation, treatment_val)).copy()
+        df = df_.query("{}=={}".format(args.col_recommendation, treatment_val))
+        train_df = df.xs("train")
 
-        X_train = df.xs("train")[args.cols_features]
-        y_train = df.xs("train")[args.col_outcome]
-
-        y_pred_train = model.predict(X_train)
+        y_train = train_df[args.col_outcome]
 
+        y_pred_train = None
         y_test = None
         y_pred_test = None
         if "test" not in df.index:
@@ -186,9 +179,14 @@ class ModelForTreatedOrUntreated:
                         )
                         log.error(error_str)
                         raise ValueError(error_str)
-                X_test = test_df[args.cols_features]
                 y_test = test_df[args.col_outcome]
-                y_pred_test = model.predict(X_test)
+                # Predict train and test at once as df is ordered train then test.
+                y_pred = model.predict(df[args.cols_features])
+                y_pred_train = y_pred[: len(train_df)]
+                y_pred_test = y_pred[len(train_df) :]
+
+        if y_pred_train is None:
+            y_pred_train = model.predict(train_df[args.cols_features])
 
         score_recommended_treatment_df = score_df(
             y_train, y_test, y_pred_train, y_pred_test, average="binary"
@@ -260,6 +258,13 @@ def model_for_untreated_simulate_recommendation(*posargs, **kwargs):
     return ModelForUntreated().simulate_recommendation(*posargs, **kwargs)
 
 
+def model_for_both_predict_proba(args, df_, models_dict):
+    X = df_[args.cols_features]
+    treated__proba = ModelForTreated().predict_proba(args, df_, models_dict, X=X)
+    untreated__proba = ModelForUntreated().predict_proba(args, df_, models_dict, X=X)
+    return treated__proba, untreated__proba
+
+
 def bundle_treated_and_untreated_models(treated_model, untreated_model):
     models_dict = dict(treated=treated_model, untreated=untreated_model)
     return models_dict
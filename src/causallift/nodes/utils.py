@@ -1,3 +1,4 @@
+import logging
 from typing import Any, Dict, Type  # NOQA
 
 from easydict import EasyDict
@@ -14,6 +15,8 @@ from sklearn.metrics import (
     roc_auc_score,
 )
 
+log = logging.getLogger(__name__)
+
 
 def get_cols_features(
     df,
@@ -53,14 +56,51 @@ def concat_train_test_df(args, train, test):
     Concatenate train and test data frames.
     Use df.xs('train') or df.xs('test') to split.
     """
-    df = pd.concat(
-        [train, test],
-        keys=["train", "test"],
+    if test is None or not (_is_default_index(train) and _is_default_index(test)):
+        df = pd.concat(
+            [train, test],
+            keys=["train", "test"],
+            names=[args.partition_name, args.index_name],
+        )
+        return df
+
+    # Both indexes are 0, 1, ..., so build the MultiIndex from codes directly
+    # instead of letting pd.concat factorize the keys and the concatenated index.
+    df = pd.concat([train, test], ignore_index=True)
+    df.index = pd.MultiIndex(
+        levels=[
+            pd.Index(["train", "test"]),
+            pd.RangeIndex(max(len(train), len(test))),
+        ],
+        codes=[
+            np.repeat(np.array([0, 1], dtype=np.int8), [len(train), len(test)]),
+            np.concatenate([np.arange(len(train)), np.arange(len(test))]),
+        ],
         names=[args.partition_name, args.index_name],
+        verify_integrity=False,
     )
     return df
 
 
+def _is_default_index(df):
+    return pd.api.types.is_integer_dtype(df.index) and df.index.equals(
+        pd.RangeIndex(len(df))
+    )
+
+
+def display(df):
+    r"""
+    Display the data frame using IPython if available, otherwise print it.
+    IPython is imported only when called to keep the import of causallift light.
+    """
+    try:
+        from IPython.display import display as ipython_display
+    except ImportError:
+        print(df.to_string())
+        return
+    ipython_display(df)
+
+
 def len_t(df, treatment=1.0, col_treatment="Treatment"):
     return df.query("{}=={}".format(col_treatment, treatment)).shape[0]
 
@@ -87,10 +127,12 @@ def treatment_fractions_(
     df,  # type: Type[pd.DataFrame]
 ):
     # type: (...) -> Type[EasyDict]
-    col_treatment = args.col_treatment
+    # Compute on the treatment column only rather than querying each partition
+    # of the whole data frame.
+    treatment = df[args.col_treatment]
     treatment_fractions = {
-        "train": treatment_fraction_(df.xs("train"), col_treatment=col_treatment),
-        "test": treatment_fraction_(df.xs("test"), col_treatment=col_treatment),
+        "train": np.mean(treatment.xs("train").to_numpy() == 1.0),
+        "test": np.mean(treatment.xs("test").to_numpy() == 1.0),
     }
     return EasyDict(treatment_fractions)
 
@@ -213,16 +255,18 @@ def bundle_train_and_test_data(args, train_df, test_df):
     assert isinstance(train_df, pd.DataFrame)
     # assert isinstance(test_df, pd.DataFrame)
     # assert set(train_df.columns) == set(test_df.columns)
-    assert all([isinstance(col_name, str) for col_name in train_df.columns])
+    assert all(isinstance(col_name, str) for col_name in train_df.columns)
 
     index_name = args.index_name
 
     if index_name is not None:
-        train_df = train_df.reset_index(drop=True).copy()
-        train_df.index.name = index_name
+        # The data is copied when concatenated, so replace the index of a shallow
+        # copy instead of copying the data here as well.
+        train_df = train_df.copy(deep=False)
+        train_df.index = pd.RangeIndex(len(train_df), name=index_name)
         if test_df is not None:
-            test_df = test_df.reset_index(drop=True).copy()
-            test_df.index.name = index_name
+            test_df = test_df.copy(deep=False)
+            test_df.index = pd.RangeIndex(len(test_df), name=index_name)
     elif test_df is not None:
         assert train_df.index.name == test_df.index.name
 
@@ -246,24 +290,61 @@ def impute_cols_features(args, df):
 
 
 def compute_cate(proba_treated, proba_untreated):
-    cate_estimated = proba_treated - proba_untreated
+    # Both are predicted for the same rows, so subtract the arrays instead of
+    # aligning the two MultiIndexes.
+    cate_estimated = pd.Series(
+        np.asarray(proba_treated) - np.asarray(proba_untreated),
+        index=proba_treated.index,
+    )
     return cate_estimated
 
 
 def add_cate_to_df(args, df, cate_estimated, proba_treated, proba_untreated):
-    df.loc[:, args.col_proba_if_treated] = proba_treated
-    df.loc[:, args.col_proba_if_untreated] = proba_untreated
-    df.loc[:, args.col_cate] = cate_estimated.values
+    # The probabilities are in the same row order as df, so assign the arrays
+    # rather than aligning the series on the MultiIndex.
+    df[args.col_proba_if_treated] = proba_treated.to_numpy()
+    df[args.col_proba_if_untreated] = proba_untreated.to_numpy()
+    df[args.col_cate] = cate_estimated.to_numpy()
     return df
 
 
+def top_k_mask(v, k):
+    r"""
+    Return 1.0 for the k largest values of the array and 0.0 for the others.
+    Selected in O(n) using a partition instead of ranking.
+    Ties at the threshold are broken by position, so the result is
+    deterministic and exactly k values are selected.
+    NaN values are never selected, so at most the number of non-NaN values
+    are selected.
+    """
+    n = len(v)
+    valid = ~np.isnan(v)
+    if not valid.all():
+        r = np.zeros(n)
+        r[valid] = top_k_mask(v[valid], k)
+        return r
+    if k <= 0:
+        return np.zeros(n)
+    if k >= n:
+        return np.ones(n)
+    threshold = np.partition(v, n - k)[n - k]
+    r = np.zeros(n)
+    above = v > threshold
+    r[above] = 1.0
+    r[np.flatnonzero(v == threshold)[: k - np.count_nonzero(above)]] = 1.0
+    return r
+
+
 def recommend_by_cate(args, df, treatment_fractions):
     cate_series = df[args.col_cate]
 
     def recommendation(cate_series, treatment_fraction):
-        rank_series = cate_series.rank(method="first", ascending=False, pct=True)
-        r = np.where(rank_series <= treatment_fraction, 1.0, 0.0)
-        return r
+        # Round rather than truncate, as the fraction is typically the observed
+        # fraction of treated samples, e.g. int(22 * (15 / 22)) is 14, not 15.
+        # As in ranking, NaN CATE values are not counted.
+        v = cate_series.to_numpy()
+        k = int(round(np.count_nonzero(~np.isnan(v)) * treatment_fraction))
+        return top_k_mask(v, k)
 
     recommendation_train = recommendation(
         cate_series.xs("train"), treatment_fractions.train
@@ -272,53 +353,81 @@ def recommend_by_cate(args, df, treatment_fractions):
         cate_series.xs("test"), treatment_fractions.test
     )
 
-    df.loc[:, args.col_recommendation] = concat_train_test(
-        args, recommendation_train, recommendation_test
+    df[args.col_recommendation] = np.concatenate(
+        [recommendation_train, recommendation_test]
     )
 
     return df
 
 
 def estimate_effect(sim_treated_df, sim_untreated_df):
-    estimated_effect_df = pd.DataFrame()
+    def weighted_average(col_samples, col_rate):
+        # Computed on the underlying arrays as both data frames share the same
+        # partition index.
+        treated_samples = sim_treated_df[col_samples].to_numpy()
+        untreated_samples = sim_untreated_df[col_samples].to_numpy()
+        return (
+            treated_samples * sim_treated_df[col_rate].to_numpy()
+            + untreated_samples * sim_untreated_df[col_rate].to_numpy()
+        ) / (treated_samples + untreated_samples)
+
+    estimated_effect_df = pd.DataFrame(index=sim_treated_df.index)
 
     estimated_effect_df["# samples"] = (
-        sim_treated_df["# samples chosen without uplift model"]
-        + sim_untreated_df["# samples chosen without uplift model"]
+        sim_treated_df["# samples chosen without uplift model"].to_numpy()
+        + sim_untreated_df["# samples chosen without uplift model"].to_numpy()
     )
 
-    ## Original (without uplift model)
+    with np.errstate(divide="ignore", invalid="ignore"):
 
-    estimated_effect_df["observed conversion rate without uplift model"] = (
-        sim_treated_df["# samples chosen without uplift model"]
-        * sim_treated_df["observed conversion rate without uplift model"]
-        + sim_untreated_df["# samples chosen without uplift model"]
-        * sim_untreated_df["observed conversion rate without uplift model"]
-    ) / (
-        sim_treated_df["# samples chosen without uplift model"]
-        + sim_untreated_df["# samples chosen without uplift model"]
-    )
+        ## Original (without uplift model)
 
-    ## Recommended (with uplift model)
+        observed_rate = weighted_average(
+            "# samples chosen without uplift model",
+            "observed conversion rate without uplift model",
+        )
 
-    estimated_effect_df["predicted conversion rate using uplift model"] = (
-        sim_treated_df["# samples recommended by uplift model"]
-        * sim_treated_df["predicted conversion rate using uplift model"]
-        + sim_untreated_df["# samples recommended by uplift model"]
-        * sim_untreated_df["predicted conversion rate using uplift model"]
-    ) / (
-        sim_treated_df["# samples recommended by uplift model"]
-        + sim_untreated_df["# samples recommended by uplift model"]
-    )
+        ## Recommended (with uplift model)
 
-    estimated_effect_df["predicted improvement rate"] = (
-        estimated_effect_df["predicted conversion rate using uplift model"]
-        / estimated_effect_df["observed conversion rate without uplift model"]
-    )
+        predicted_rate = weighted_average(
+            "# samples recommended by uplift model",
+            "predicted conversion rate using uplift model",
+        )
+
+        improvement_rate = predicted_rate / observed_rate
+
+    estimated_effect_df["observed conversion rate without uplift model"] = observed_rate
+    estimated_effect_df["predicted conversion rate using uplift model"] = predicted_rate
+    estimated_effect_df["predicted improvement rate"] = improvement_rate
 
     return estimated_effect_df
 
 
+def xgboost_gpu_params():
+    # type: (...) -> Dict[str, Any]
+    r"""
+    Return the constant parameters to fit XGBoost models on GPU.
+    Return an empty dict if CUDA is not available so that the models are fit on CPU.
+    """
+    try:
+        import cupy
+
+        if cupy.cuda.runtime.getDeviceCount() < 1:
+            raise RuntimeError("No CUDA device found.")
+        import xgboost
+    except Exception as e:  # NOQA
+        log.warning(
+            "[Warning] Could not use GPU ({}). XGBoost models will be fit on CPU.".format(
+                e
+            )
+        )
+        return dict()
+
+    if int(xgboost.__version__.split(".")[0]) >= 2:
+        return dict(device="cuda", tree_method="hist")
+    return dict(tree_method="gpu_hist", predictor="gpu_predictor", gpu_id=0)
+
+
 def initialize_model(
     args,  # type: Type[EasyDict]
     model_key="uplift_model_params",  # type: str
@@ -336,12 +445,17 @@ def initialize_model(
     estimator_str = model_params.pop("estimator")
     estimator_obj = load_obj(estimator_str)
 
-    const_params = (
+    # Copy as model_params is a shallow copy of the caller's params.
+    const_params = dict(
         (model_params.pop("const_params") or dict())
         if "const_params" in model_params
         else dict()
     )
 
+    if args.get("use_gpu") and estimator_str.startswith("xgboost."):
+        for k, v in xgboost_gpu_params().items():
+            const_params.setdefault(k, v)
+
     if not model_params.get("search_cv"):
         const_params.update(model_params)
         model = estimator_obj(**const_params)
@@ -135,14 +135,9 @@ def create_pipeline(**kwargs):
             Pipeline(
                 [
                     node(
-                        model_for_treated_predict_proba,
+                        model_for_both_predict_proba,
                         ["args", "df_01", "uplift_models_dict"],
-                        "treated__proba",
-                    ),
-                    node(
-                        model_for_untreated_predict_proba,
-                        ["args", "df_01", "uplift_models_dict"],
-                        "untreated__proba",
+                        ["treated__proba", "untreated__proba"],
                     ),
                 ],
                 name="321_predict_proba",
@@ -0,0 +1,80 @@
+from pathlib import Path
+import sys
+
+from easydict import EasyDict
+
+from causallift.nodes import utils
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+GPU_PARAMS = dict(tree_method="gpu_hist", gpu_id=0)
+
+
+def test_initialize_model_should_merge_gpu_params_for_xgboost(mocker):
+    mocker.patch.object(utils, "xgboost_gpu_params", return_value=GPU_PARAMS)
+    const_params = dict(max_depth=3)
+    uplift_model_params = dict(
+        estimator="xgboost.XGBClassifier", const_params=const_params
+    )
+
+    # A plain dict is used as EasyDict would copy the nested params.
+    args = dict(use_gpu=True, uplift_model_params=uplift_model_params)
+    model = utils.initialize_model(args, model_key="uplift_model_params")
+
+    params = model.get_params()
+    assert params["tree_method"] == "gpu_hist"
+    assert params["gpu_id"] == 0
+    assert params["max_depth"] == 3
+
+    # The caller's params are not modified, so they can be reused without GPU.
+    assert const_params == dict(max_depth=3)
+    args = dict(use_gpu=False, uplift_model_params=uplift_model_params)
+    model = utils.initialize_model(args, model_key="uplift_model_params")
+    assert model.get_params().get("tree_method") != "gpu_hist"
+
+
+def test_initialize_model_should_merge_gpu_params_into_search_cv_estimator(mocker):
+    mocker.patch.object(utils, "xgboost_gpu_params", return_value=GPU_PARAMS)
+    uplift_model_params = dict(
+        search_cv="sklearn.model_selection.GridSearchCV",
+        estimator="xgboost.XGBClassifier",
+        const_params=dict(max_depth=3),
+        param_grid=dict(n_estimators=[10]),
+    )
+
+    args = EasyDict(dict(use_gpu=True, uplift_model_params=uplift_model_params))
+    model = utils.initialize_model(args, model_key="uplift_model_params")
+
+    assert model.estimator.get_params()["tree_method"] == "gpu_hist"
+
+
+def test_initialize_model_should_not_override_user_params_with_gpu_params(mocker):
+    mocker.patch.object(utils, "xgboost_gpu_params", return_value=GPU_PARAMS)
+    uplift_model_params = dict(
+        estimator="xgboost.XGBClassifier", const_params=dict(tree_method="exact")
+    )
+
+    args = EasyDict(dict(use_gpu=True, uplift_model_params=uplift_model_params))
+    model = utils.initialize_model(args, model_key="uplift_model_params")
+
+    params = model.get_params()
+    assert params["tree_method"] == "exact"
+    assert params["gpu_id"] == 0
+
+
+def test_initialize_model_should_not_merge_gpu_params_for_non_xgboost(mocker):
+    gpu_params = mocker.patch.object(
+        utils, "xgboost_gpu_params", return_value=GPU_PARAMS
+    )
+    uplift_model_params = dict(
+        estimator="sklearn.linear_model.LogisticRegression",
+        const_params=dict(C=0.5),
+    )
+
+    args = EasyDict(dict(use_gpu=True, uplift_model_params=uplift_model_params))
+    model = utils.initialize_model(args, model_key="uplift_model_params")
+
+    gpu_params.assert_not_called()
+    assert "tree_method" not in model.get_params()
+    assert model.get_params()["C"] == 0.5
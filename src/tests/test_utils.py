@@ -70,6 +70,30 @@ class UtilsTest(unittest.TestCase):
         pd.testing.assert_frame_equal(train_df, result.xs("train"))
         pd.testing.assert_frame_equal(test_df, result.xs("test"))
 
+    def test_concat_train_test_df_should_concatnate_frames_of_different_lengths_with_keys(
+        self,
+    ):
+        args = EasyDict(dict(index_name="index", partition_name="partition"))
+        train_df = pd.DataFrame(
+            data=np.random.rand(4, 3), columns=["var1", "var2", "var3"]
+        )
+        train_df.index.name = args.index_name
+        test_df = pd.DataFrame(
+            data=np.random.rand(2, 3), columns=["var1", "var2", "var3"]
+        )
+        test_df.index.name = args.index_name
+
+        result = utils.concat_train_test_df(args=args, train=train_df, test=test_df)
+        expected = pd.concat(
+            [train_df, test_df],
+            keys=["train", "test"],
+            names=[args.partition_name, args.index_name],
+        )
+
+        pd.testing.assert_frame_equal(expected, result)
+        pd.testing.assert_frame_equal(train_df, result.xs("train"))
+        pd.testing.assert_frame_equal(test_df, result.xs("test"))
+
     def test_len_t_should_return_the_number_of_records_where_treatment_equals_1(self):
         df = pd.DataFrame(data=np.random.rand(6, 2), columns=["var1", "var2"])
         df["Treatment"] = [random.sample(range(2), 1)[0] for i in range(6)]
@@ -186,6 +210,31 @@ class UtilsTest(unittest.TestCase):
 
         self.assertEqual(value, result)
 
+    def test_treatment_fractions_should_compute_percentage_of_treated_for_each_partition(
+        self,
+    ):
+        args = EasyDict(
+            dict(index_name="index", partition_name="partition", col_treatment="T")
+        )
+        train_df = pd.DataFrame(
+            dict(T=[random.sample(range(2), 1)[0] for i in range(12)])
+        )
+        train_df.index.name = args.index_name
+        test_df = pd.DataFrame(
+            dict(T=[random.sample(range(2), 1)[0] for i in range(6)])
+        )
+        test_df.index.name = args.index_name
+        df = utils.concat_train_test_df(args=args, train=train_df, test=test_df)
+
+        result = utils.treatment_fractions_(args, df)
+
+        self.assertEqual(
+            utils.treatment_fraction_(train_df, col_treatment="T"), result.train
+        )
+        self.assertEqual(
+            utils.treatment_fraction_(test_df, col_treatment="T"), result.test
+        )
+
     def test_outcome_fraction_should_compute_percentage_of_positive_outcome(self):
         df = pd.DataFrame(data=np.random.rand(12, 2), columns=["var1", "var2"])
         df["Outcome"] = [random.sample(range(2), 1)[0] for i in range(12)]
@@ -252,6 +301,91 @@ class UtilsTest(unittest.TestCase):
 
         self.assertEqual(gain, result)
 
+    def test_recommend_by_cate_should_recommend_top_fraction_with_ties_broken_by_position(
+        self,
+    ):
+        args = EasyDict(
+            dict(
+                index_name="index",
+                partition_name="partition",
+                col_cate="CATE",
+                col_recommendation="Recommendation",
+            )
+        )
+        train_df = pd.DataFrame(dict(CATE=[0.1, 0.5, 0.3, 0.5, -0.2, 0.3]))
+        train_df.index.name = args.index_name
+        test_df = pd.DataFrame(dict(CATE=[0.2, 0.2, 0.2, 0.4]))
+        test_df.index.name = args.index_name
+        df = utils.concat_train_test_df(args=args, train=train_df, test=test_df)
+        treatment_fractions = EasyDict(dict(train=0.5, test=0.5))
+
+        result = utils.recommend_by_cate(args, df, treatment_fractions)
+
+        np.testing.assert_array_equal(
+            [0.0, 1.0, 1.0, 1.0, 0.0, 0.0],
+            result.xs("train")["Recommendation"].values,
+        )
+        np.testing.assert_array_equal(
+            [1.0, 0.0, 0.0, 1.0], result.xs("test")["Recommendation"].values
+        )
+
+    def test_recommend_by_cate_should_recommend_as_many_samples_as_treated_in_observation(
+        self,
+    ):
+        args = EasyDict(
+            dict(
+                index_name="index",
+                partition_name="partition",
+                col_cate="CATE",
+                col_recommendation="Recommendation",
+            )
+        )
+        train_df = pd.DataFrame(dict(CATE=np.random.rand(22)))
+        train_df.index.name = args.index_name
+        test_df = pd.DataFrame(dict(CATE=np.random.rand(23)))
+        test_df.index.name = args.index_name
+        df = utils.concat_train_test_df(args=args, train=train_df, test=test_df)
+        treatment_fractions = EasyDict(dict(train=15 / 22, test=13 / 23))
+
+        result = utils.recommend_by_cate(args, df, treatment_fractions)
+
+        self.assertEqual(15, result.xs("train")["Recommendation"].sum())
+        self.assertEqual(13, result.xs("test")["Recommendation"].sum())
+
+    def test_top_k_mask_should_not_select_nan(self):
+        v = np.array([0.3, np.nan, 0.1, np.nan, 0.5, 0.2])
+
+        np.testing.assert_array_equal(
+            [1.0, 0.0, 0.0, 0.0, 1.0, 1.0], utils.top_k_mask(v, 3)
+        )
+        np.testing.assert_array_equal(
+            [1.0, 0.0, 1.0, 0.0, 1.0, 1.0], utils.top_k_mask(v, 5)
+        )
+
+    def test_recommend_by_cate_should_recommend_top_fraction_of_non_nan_cate(self):
+        args = EasyDict(
+            dict(
+                index_name="index",
+                partition_name="partition",
+                col_cate="CATE",
+                col_recommendation="Recommendation",
+            )
+        )
+        train_df = pd.DataFrame(dict(CATE=[0.3, np.nan, 0.1, np.nan, 0.5, 0.2]))
+        train_df.index.name = args.index_name
+        test_df = pd.DataFrame(dict(CATE=[0.1, 0.2]))
+        test_df.index.name = args.index_name
+        df = utils.concat_train_test_df(args=args, train=train_df, test=test_df)
+        treatment_fractions = EasyDict(dict(train=0.5, test=0.5))
+
+        result = utils.recommend_by_cate(args, df, treatment_fractions)
+
+        self.assertEqual(
+            [1.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+            result.xs("train")["Recommendation"].tolist(),
+        )
+        self.assertEqual([0.0, 1.0], result.xs("test")["Recommendation"].tolist())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 from pathlib import Path
 import sys
 
+from kedro.io import MemoryDataSet
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
@@ -198,10 +199,87 @@ def test_enable_ipw_without_known_propensity_no_runner():
     assert isinstance(estimated_effect_df, pd.DataFrame)
 
 
+def test_use_gpu():
+    seed = 0
+
+    df = generate_data(
+        N=1000,
+        n_features=3,
+        beta=[0, -2, 3, -5],  # Effect of [intercept and features] on outcome
+        error_std=0.1,
+        tau=[1, -5, -5, 10],  # Effect of [intercept and features] on treated outcome
+        tau_std=0.1,
+        discrete_outcome=True,
+        seed=seed,
+        feature_effect=0,  # Effect of beta on treated outxome
+        propensity_coef=[
+            0,
+            -1,
+            1,
+            -1,
+        ],  # Effect of [intercept and features] on propensity log-odds for treatment
+        index_name="index",
+    )
+
+    train_df, test_df = train_test_split(
+        df, test_size=0.2, random_state=seed, stratify=df["Treatment"]
+    )
+
+    # Falls back to CPU if CUDA is not available
+    cl = CausalLift(train_df, test_df, enable_ipw=True, verbose=3, use_gpu=True)
+    train_df, test_df = cl.estimate_cate_by_2_models()
+    estimated_effect_df = cl.estimate_recommendation_impact()
+    assert isinstance(train_df, pd.DataFrame)
+    assert isinstance(test_df, pd.DataFrame)
+    assert isinstance(estimated_effect_df, pd.DataFrame)
+
+
+def test_train_df_in_dataset_catalog():
+
+    seed = 0
+
+    df = generate_data(
+        N=1000,
+        n_features=3,
+        beta=[0, -2, 3, -5],  # Effect of [intercept and features] on outcome
+        error_std=0.1,
+        tau=[1, -5, -5, 10],  # Effect of [intercept and features] on treated outcome
+        tau_std=0.1,
+        discrete_outcome=True,
+        seed=seed,
+        feature_effect=0,  # Effect of beta on treated outxome
+        propensity_coef=[
+            0,
+            -1,
+            1,
+            -1,
+        ],  # Effect of [intercept and features] on propensity log-odds for treatment
+        index_name="index",
+    )
+
+    train_df, test_df = train_test_split(
+        df, test_size=0.2, random_state=seed, stratify=df["Treatment"]
+    )
+
+    cl = CausalLift(
+        test_df=test_df,
+        enable_ipw=True,
+        verbose=3,
+        dataset_catalog=dict(train_df=MemoryDataSet(train_df)),
+    )
+    out_train_df, out_test_df = cl.estimate_cate_by_2_models()
+    estimated_effect_df = cl.estimate_recommendation_impact()
+    assert len(out_train_df) == len(train_df)
+    assert len(out_test_df) == len(test_df)
+    assert isinstance(estimated_effect_df, pd.DataFrame)
+
+
 if __name__ == "__main__":
     test_enable_ipw_without_known_propensity()
     test_enable_ipw_without_known_propensity_conditionally_skip()
     test_disable_ipw()
     test_enable_ipw_with_known_propensity()
     test_enable_ipw_without_known_propensity_no_runner()
+    test_use_gpu()
+    test_train_df_in_dataset_catalog()
     # test_enable_ipw_without_known_propensity_parallel_runner()